@@ -1,7 +1,14 @@
 from typing import Self
+import os
+import shutil
+import tempfile
 import unittest
+from unittest import mock
 import xrk
 import math
+import numpy as np
+
+HAVE_NUMBA = xrk.njit is not None
 
 class XrkTest(unittest.TestCase):
     Self.xrk = xrk.XRK('test.xrk')
@@ -69,6 +76,32 @@ class XrkTest(unittest.TestCase):
         }
         self.assertDictEqual(channeldata, foundchanneldata)
                 
+    def testChannelMap(self):
+        # a file of our own, since we're going to close it
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'channels.xrk')
+            shutil.copy('test.xrk', filename)
+            x = xrk.XRK(filename)
+
+            # membership doesn't build anything, a lookup builds just that one
+            self.assertIn('GPS Speed', x.channels)
+            self.assertNotIn('Nope', x.channels)
+            self.assertEqual(x.channels._channels, {})
+            channel = x.channels['GPS Speed']
+            self.assertEqual(list(x.channels._channels), ['GPS Speed'])
+            self.assertIs(x.channels['GPS Speed'], channel)
+
+            with self.assertRaises(KeyError):
+                x.channels['Nope']
+
+            channel.samples(xtime=True)
+            with mock.patch.object(x.channels, 'clear_cache',
+                                   wraps=x.channels.clear_cache) as clear_cache:
+                self.assertTrue(x.close())
+            clear_cache.assert_called_once_with()
+            self.assertEqual(x.channels._channels, {})
+            self.assertEqual(len(x._samples_cache), 0)
+
     def testLapInfo(self):
         current = 0
         for i in range(len(self.xrk.lap_info)):
@@ -91,6 +124,16 @@ class XrkTest(unittest.TestCase):
             self.assertTrue(math.isclose(samples[0][0], start, rel_tol=0.003))
             self.assertTrue(math.isclose(samples[0][-1] - samples[0][0], duration, rel_tol=0.003))
 
+    def testBadLap(self):
+        # a lap that doesn't exist gets an error count from the DLL; that
+        # should fail every time rather than being remembered
+        channel = self.xrk.channels['AccelerometerX']
+        lap = self.xrk.lapcount + 5
+        for _ in range(2):
+            with self.assertRaises(AssertionError):
+                channel.samples(lap=lap, xtime=True)
+            self.assertNotIn(lap, channel._counts)
+
     def testTdLookup(self):
         # for each lap time, grab the time and ask for the distance, then ask
         # for that disance and make sure we get the time back
@@ -99,6 +142,91 @@ class XrkTest(unittest.TestCase):
             gtime = self.xrk.distancetotime(distance)
             self.assertEqual(gtime, starttime)
 
+    def testTdArrays(self):
+        times, distances = self.xrk.timedistance
+        # distance starts from nothing and never goes backwards
+        self.assertEqual(distances[0], 0)
+        self.assertTrue(np.all(np.diff(distances) >= 0))
+
+        # at a GPS sample time the distance is that sample's running total
+        idx = np.array([1, len(times) // 2, len(times) - 1])
+        self.assertEqual(list(self.xrk.timetodistance_array(times[idx])),
+                         list(np.round(distances[idx], 4)))
+
+        # and halfway between two GPS samples it's halfway between their totals
+        mids = (times[idx-1] + times[idx]) / 2
+        expected = (distances[idx-1] + distances[idx]) / 2
+        for got, want in zip(self.xrk.timetodistance_array(mids), expected):
+            self.assertAlmostEqual(got, want, places=3)
+
+    def testInterpLookup(self):
+        # needle before the start extrapolates, exact hits on a flat stretch
+        # give the first match, between samples interpolates, past the end clamps
+        haystack = np.array([1.0, 2.0, 3.0, 3.0, 3.0, 5.0])
+        cdata = np.array([10.0, 20.0, 30.0, 40.0, 50.0, 70.0])
+        needles = np.array([0.0, 1.0, 1.5, 3.0, 4.0, 6.0])
+        for lookup in (xrk._interp_lookup, xrk._interp_lookup_np):
+            self.assertEqual(list(lookup(needles, haystack, cdata)),
+                             [0.0, 10.0, 15.0, 30.0, 60.0, 70.0])
+            # a single sample has nothing to interpolate with
+            self.assertEqual(list(lookup(np.array([0.0, 1.0, 2.0]), np.array([1.0]),
+                                         np.array([5.0]))), [5.0, 5.0, 5.0])
+
+    def testCumDistance(self):
+        # each speed covers the time since the previous sample
+        seconds = np.array([0.0, 1.0, 3.0, 4.0])
+        speeds = np.array([5.0, 10.0, 2.0, 7.0])
+        for cumdistance in (xrk._cumdistance, xrk._cumdistance_np):
+            self.assertEqual(list(cumdistance(seconds, speeds)), [0.0, 10.0, 14.0, 21.0])
+
+    @unittest.skipUnless(HAVE_NUMBA, "numba not installed")
+    def testKernelsMatch(self):
+        # the numba kernels have to give exactly what the numpy ones do
+        seconds, speeds = self.xrk.channels['GPS Speed'].samples(xabsolute=True, xtime=True)
+        self.assertTrue(np.array_equal(xrk._cumdistance(seconds, speeds),
+                                       xrk._cumdistance_np(seconds, speeds)))
+
+        times, distances = self.xrk.timedistance
+        for haystack, cdata in ((times, distances), (distances, times)):
+            needles = np.concatenate((haystack[::7], (haystack[:-1] + haystack[1:]) / 2,
+                                      [haystack[0] - 1.0, haystack[-1] + 1.0]))
+            self.assertTrue(np.array_equal(xrk._interp_lookup(needles, haystack, cdata),
+                                           xrk._interp_lookup_np(needles, haystack, cdata)))
+
+    def testSamplesCache(self):
+        # fetched samples are reused, but only the most recent few are kept
+        channel = self.xrk.channels['AccelerometerX']
+        self.assertIs(channel._samples_raw(), channel._samples_raw())
+        for name, channel in self.xrk.channels.items():
+            channel.samples(xtime=True)
+        self.assertEqual(len(self.xrk._samples_cache), xrk.SAMPLES_CACHE_SIZE)
+
+    def testSamplesDistance(self):
+        # GPS Speed samples are the ones timedistance is built from, so in
+        # distance they should land exactly on its running totals
+        channel = self.xrk.channels['GPS Speed']
+        times, distances = self.xrk.timedistance
+        xvalues, values = channel.samples(xabsolute=True)
+        self.assertEqual(list(xvalues), list(np.round(distances, 4)))
+        self.assertEqual(list(values), list(channel.samples(xtime=True)[1]))
+
+    def testSamplesLapRelative(self):
+        # relative lap samples should start at 0, give or take a couple of
+        # sample periods in time, or the distance the car can cover in that
+        # at its top speed
+        channel = self.xrk.channels['AccelerometerX']
+        topspeed = self.xrk.channels['GPS Speed'].samples(xtime=True)[1].max()
+
+        # XXX skip first lap in range() call because ... data is missing?
+        for i in range(1, len(self.xrk.lap_info)):
+            times = channel.samples(lap=i, xtime=True, xabsolute=True)[0]
+            period = np.median(np.diff(times))
+
+            samples = channel.samples(lap=i, xtime=True)
+            self.assertAlmostEqual(samples[0][0], 0, delta=2 * period)
+
+            samples = channel.samples(lap=i)
+            self.assertAlmostEqual(samples[0][0], 0, delta=2 * period * topspeed)
 
 if __name__ == '__main__':
     unittest.main() 
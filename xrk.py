@@ -6,14 +6,21 @@
 # Copyright (c) 2023, Jacob Hill, (trapperrnz@gmail.com)
 #
 
-import bisect
+from collections import OrderedDict
+from collections.abc import Mapping
 from ctypes import *
 import datetime
 import functools
 import os
-import time
 import textwrap
 
+import numpy as np
+try:
+    # optional: JITs the timedistance kernels below, numpy otherwise
+    from numba import njit
+except ImportError:
+    njit = None
+
 DLLNAME = os.path.join(os.path.dirname(__file__), 'MatLabXRK-2017-64-ReleaseU.dll')
 XRKDLL = cdll.LoadLibrary(DLLNAME)
 
@@ -46,25 +53,222 @@ XRKDLL.get_GPS_channel_units.restype = c_char_p
 XRKDLL.get_GPS_raw_channel_name.restype = c_char_p
 XRKDLL.get_GPS_raw_channel_units.restype = c_char_p
 
+# And declare the argument types so ctypes doesn't have to work out how to
+# marshal every argument on every call.
+# awk '/EXPORTED_FUNCTION/' MatLabXRK.h
+XRKDLL.get_library_date.argtypes = []
+XRKDLL.get_library_time.argtypes = []
+XRKDLL.open_file.argtypes = [c_char_p]
+XRKDLL.close_file_n.argtypes = [c_char_p]
+XRKDLL.close_file_i.argtypes = [c_int]
+XRKDLL.get_vehicle_name.argtypes = [c_int]
+XRKDLL.get_track_name.argtypes = [c_int]
+XRKDLL.get_racer_name.argtypes = [c_int]
+XRKDLL.get_championship_name.argtypes = [c_int]
+XRKDLL.get_venue_type_name.argtypes = [c_int]
+XRKDLL.get_date_and_time.argtypes = [c_int]
+XRKDLL.get_laps_count.argtypes = [c_int]
+XRKDLL.get_lap_info.argtypes = [c_int, c_int, POINTER(c_double), POINTER(c_double)]
+# the sample functions write straight into numpy arrays
+_c_doubles = np.ctypeslib.ndpointer(dtype=np.float64, flags='C_CONTIGUOUS,WRITEABLE')
+for _prefix in ('', 'GPS_', 'GPS_raw_'):
+    getattr(XRKDLL, f'get_{_prefix}channels_count').argtypes = [c_int]
+    getattr(XRKDLL, f'get_{_prefix}channel_name').argtypes = [c_int, c_int]
+    getattr(XRKDLL, f'get_{_prefix}channel_units').argtypes = [c_int, c_int]
+    getattr(XRKDLL, f'get_{_prefix}channel_samples_count').argtypes = [c_int, c_int]
+    getattr(XRKDLL, f'get_{_prefix}channel_samples').argtypes = [
+        c_int, c_int, _c_doubles, _c_doubles, c_int]
+    getattr(XRKDLL, f'get_lap_{_prefix}channel_samples_count').argtypes = [c_int, c_int, c_int]
+    getattr(XRKDLL, f'get_lap_{_prefix}channel_samples').argtypes = [
+        c_int, c_int, c_int, _c_doubles, _c_doubles, c_int]
+
+# The DLL has the same set of channel functions for each kind of channel;
+# these are the per-kind function tables XRKChannel dispatches through:
+# (units, samples_count, samples, lap_samples_count, lap_samples)
+CHANNEL, GPS_CHANNEL, GPS_RAW_CHANNEL = range(3)
+_CHANNEL_FNS = tuple(
+    (getattr(XRKDLL, f'get_{prefix}channel_units'),
+     getattr(XRKDLL, f'get_{prefix}channel_samples_count'),
+     getattr(XRKDLL, f'get_{prefix}channel_samples'),
+     getattr(XRKDLL, f'get_lap_{prefix}channel_samples_count'),
+     getattr(XRKDLL, f'get_lap_{prefix}channel_samples'))
+    for prefix in ('', 'GPS_', 'GPS_raw_'))
+# and the per-file (channels_count, channel_name) pair for each kind
+_CHANNEL_NAME_FNS = tuple(
+    (getattr(XRKDLL, f'get_{prefix}channels_count'),
+     getattr(XRKDLL, f'get_{prefix}channel_name'))
+    for prefix in ('', 'GPS_', 'GPS_raw_'))
+
+# How many channel/lap sample fetches each open file keeps around
+SAMPLES_CACHE_SIZE = 8
+
+
+# timedistance kernels. The numpy versions always exist; when numba is
+# around the loop versions below are JIT'd and used instead, doing the same
+# float operations in the same order so results don't depend on whether
+# numba is installed (test_xrk checks the two against each other).
+def _cumdistance_np(seconds, speeds):
+    '''Running distance covered, each speed sample applying to the time
+    since the previous sample'''
+    out = np.empty(len(seconds), dtype=np.float64)
+    out[0] = 0.0
+    np.cumsum(np.diff(seconds) * speeds[1:], out=out[1:])
+    return out
+
+def _interp_lookup_np(needles, haystack, cdata):
+    '''Find each needle in haystack and return the corresponding point in
+    cdata, interpolating between samples. An exact hit returns the first
+    matching sample, needles before the start extrapolate from the first
+    two samples and needles past the end get the last sample.'''
+    n = len(haystack)
+    if n == 1:
+        # nothing to interpolate or extrapolate with
+        return np.full(len(needles), cdata[0], dtype=np.float64)
+    idx = np.searchsorted(haystack, needles, side='left')
+    lo = np.clip(idx - 1, 0, n - 2)
+    d = haystack[lo+1] - haystack[lo]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(d != 0.0, (needles - haystack[lo]) / d, 0.0)
+    out = cdata[lo] + (cdata[lo+1] - cdata[lo]) * ratio
+    hit = np.minimum(idx, n - 1)
+    out = np.where(haystack[hit] == needles, cdata[hit], out)
+    return np.where(idx >= n, cdata[n-1], out)
+
+if njit:
+    @njit(cache=True)
+    def _cumdistance(seconds, speeds):
+        out = np.empty_like(seconds)
+        out[0] = 0.0
+        tot = 0.0
+        for i in range(1, len(seconds)):
+            tot += (seconds[i] - seconds[i-1]) * speeds[i]
+            out[i] = tot
+        return out
+
+    @njit(cache=True)
+    def _interp_lookup(needles, haystack, cdata):
+        n = len(haystack)
+        out = np.empty(len(needles), dtype=np.float64)
+        if n == 1:
+            # nothing to interpolate or extrapolate with
+            out[:] = cdata[0]
+            return out
+        for k in range(len(needles)):
+            needle = needles[k]
+            # bisect_left: first idx with haystack[idx] >= needle
+            idx = 0
+            hi = n
+            while idx < hi:
+                mid = (idx + hi) // 2
+                if haystack[mid] < needle:
+                    idx = mid + 1
+                else:
+                    hi = mid
+            if idx >= n:
+                out[k] = cdata[n-1]
+            elif haystack[idx] == needle:
+                out[k] = cdata[idx]
+            else:
+                lo = idx - 1 if idx > 0 else 0
+                d = haystack[lo+1] - haystack[lo]
+                ratio = (needle - haystack[lo]) / d if d != 0.0 else 0.0
+                out[k] = cdata[lo] + (cdata[lo+1] - cdata[lo]) * ratio
+        return out
+else:
+    _cumdistance = _cumdistance_np
+    _interp_lookup = _interp_lookup_np
+
 
 # Data channel class
 class XRKChannel():
-    def __init__(self, name: str, idxf: int, idxc: int, xrk):
+    def __init__(self, name: str, idxf: int, idxc: int, xrk, kind: int=CHANNEL):
         self.name = name
         self.idxf = idxf
         self.idxc = idxc
         self.xrk = xrk
-        self.f_get_channel_units = XRKDLL.get_channel_units
-        self.f_get_channel_samples_count = XRKDLL.get_channel_samples_count
-        self.f_get_channel_samples = XRKDLL.get_channel_samples
-        self.f_get_lap_channel_samples_count = XRKDLL.get_lap_channel_samples_count
-        self.f_get_lap_channel_samples = XRKDLL.get_lap_channel_samples
+        self.kind = kind
+        self._fns = _CHANNEL_FNS[kind]
+        # sample counts by lap (None for the whole file), see _count()
+        self._counts = {}
 
     def __repr__(self) -> str:
-        return f"{self.__class__.__name__}(name='{self.name}', idxf={self.idxf}, idxc={self.idxc})"
+        return (f"{self.__class__.__name__}(name='{self.name}', idxf={self.idxf}, "
+                f"idxc={self.idxc}, kind={self.kind})")
+
+    @functools.cached_property
+    def _units(self) -> str:
+        return self._fns[0](self.idxf, self.idxc).decode('UTF-8')
 
     def units(self):
-        return self.f_get_channel_units(self.idxf, self.idxc).decode('UTF-8')
+        return self._units
+
+    def _count(self, lap: int=None) -> int:
+        '''Number of samples in the channel, or in one lap of it. These don't
+        change for an open file, so only ask the DLL once.'''
+        try:
+            return self._counts[lap]
+        except KeyError:
+            pass
+        if lap:
+            count = self._fns[3](self.idxf, lap, self.idxc)
+        else:
+            count = self._fns[1](self.idxf, self.idxc)
+        # the DLL returns < 0 on error; don't hang on to those
+        if count > 0:
+            self._counts[lap] = count
+        return count
+
+    def _samples_raw(self, lap: int=None) -> 'tuple[np.ndarray, np.ndarray]':
+        '''Fetch a channel's (or a lap of a channel's) samples from the DLL,
+        keeping the most recent few in the file's samples cache.
+
+        Returns:
+            read-only ndarrays: absolute times in seconds, values
+        '''
+        key = (self.kind, self.idxc, lap)
+        cache = self.xrk._samples_cache
+        try:
+            cache.move_to_end(key)
+            return cache[key]
+        except KeyError:
+            pass
+
+        sample_count = self._count(lap)
+
+        # going with assert here ... maybe a bad call and should handle this gracefully?
+        assert(sample_count > 0), f"get samples_count returned something unexpected {sample_count}"
+
+        # Let the DLL fill numpy arrays directly: no zero fill up front and
+        # no copying out of ctypes buffers afterwards.
+        times = np.empty(sample_count, dtype=np.float64)
+        values = np.empty(sample_count, dtype=np.float64)
+
+        success = None
+        if lap:
+            success = self._fns[4](self.idxf, lap, self.idxc,
+                                   times, values, sample_count)
+        else:
+            success = self._fns[2](self.idxf, self.idxc,
+                                   times, values, sample_count)
+
+        # going with assert here ... maybe a bad call and should handle this gracefully?
+        assert(success > 0), f"get_channel_samples returned something unexpected {success}"
+
+        # The timestamps for all samples are in milliseconds, but if
+        # you ask for a lap's worth of samples with the lap function, it
+        # comes back with time in seconds. This blob does the multiply
+        # munge on the returned data.
+        if not lap:
+            np.divide(times, 1000.0, out=times)
+        np.round(times, 4, out=times)
+
+        # these live in the cache, so nobody gets to scribble on them
+        times.flags.writeable = False
+        values.flags.writeable = False
+        cache[key] = entry = (times, values)
+        if len(cache) > SAMPLES_CACHE_SIZE:
+            cache.popitem(last=False)
+        return entry
 
     def samples(self, lap: int=None, xtime: bool=False, xabsolute: bool=False):
         '''Returns data samples for a channel.
@@ -74,102 +278,106 @@ class XRKChannel():
             xasolute: is x absolute since the start of session, or relative?
 
         Returns:
-            Data points in columnar format: [[xvalues, ], [values]]
+            Data points in columnar format: [xvalues, values] as ndarrays
         '''
 
         # This function is messy idk how to make it simpler; Putting the complexity here
         # contains it rather than sprinkling it around.
         #
         # Complexity dealt with in here:
-        # . retrieve lap vs whole data file
+        # . retrieve lap vs whole data file (_samples_raw)
         # . absolute or relative for the xvalues
         # . time vs distance for xvalues
 
-        sample_count = self.f_get_channel_samples_count(self.idxf, self.idxc)
-        if lap:
-            sample_count=self.f_get_lap_channel_samples_count(self.idxf, lap, self.idxc)
-
-        # going with assert here ... maybe a bad call and should handle this gracefully?
-        assert(sample_count > 0), f"get samples_count returned something unexpected {sample_count}"
-
-        ptimes = (c_double * sample_count)()
-        pvalues = (c_double * sample_count)()
+        # lap 0 means the whole file, same as None
+        times, values = self._samples_raw(lap or None)
 
-        success = None
-        if lap:
-            success = self.f_get_lap_channel_samples(self.idxf, lap, self.idxc,
-                                                     byref(ptimes),
-                                                     byref(pvalues),
-                                                     sample_count)
+        # If dealing in distance instead of time, convert to distance here
+        if not xtime:
+            xvalues = self.xrk.timetodistance_array(times)
         else:
-            success = self.f_get_channel_samples(self.idxf, self.idxc, byref(ptimes), 
-                                                 byref(pvalues), sample_count)
-
-        # going with assert here ... maybe a bad call and should handle this gracefully?
-        assert(success > 0), f"get_channel_samples returned something unexpected {success}"
-
-        xvalues = [] # either times in seconds, or distance in meters
-        samples = []
-        for i in range(sample_count):
-            # The timestamps for all samples are in milliseconds, but if
-            # you ask for a lap's worth of samples with the lap function, it
-            # comes back with time in seconds. This blob does the multiply
-            # munge on the returned data.
-            if not lap:
-                ptime = round(ptimes[i]/1000.0, 4)
-            else:
-                ptime = round(ptimes[i], 4)
-            # If dealing in distance instead of time, convert to distance here
-            if not xtime:
-                ptime = self.xrk.timetodistance(ptime)
-
-            xvalues.append(ptime)
-            samples.append(pvalues[i])
+            xvalues = times.copy()
 
         # If not xabsolute, convert xvalues to relative by subtracting the start
         if not xabsolute and lap:
             # grab the lap start to subtract
-            lap_start, lap_duration = self.xrk.lap_info[lap]
+            lap_start = self.xrk._laps[0][lap]
             # and if not dealing in time ... convert start to distance ;)
             if not xtime:
                 lap_start = self.xrk.timetodistance(lap_start)
 
-            xvalues = [x - lap_start for x in xvalues]
+            xvalues -= lap_start
 
-        return [xvalues, samples]
+        return [xvalues, values.copy()]
 
 
-# Function pointer swizzles of generic XRKChannel
-class XRKGPSChannel(XRKChannel):
-    def __init__(self, name: str, idxf: int, idxc: int, xrk):
-        super().__init__(name, idxf, idxc, xrk)
-        self.f_get_channel_units = XRKDLL.get_GPS_channel_units
-        self.f_get_channel_samples_count = XRKDLL.get_GPS_channel_samples_count
-        self.f_get_channel_samples = XRKDLL.get_GPS_channel_samples
-        self.f_get_lap_channel_samples_count = XRKDLL.get_lap_GPS_channel_samples_count
-        self.f_get_lap_channel_samples = XRKDLL.get_lap_GPS_channel_samples
+# Channels of a file by name, only wrapping a channel once it's asked for
+class _ChannelMap(Mapping):
+    def __init__(self, xrk):
+        self.xrk = xrk
+        self._channels = {}
 
+    @functools.cached_property
+    def _index(self) -> 'dict[str, tuple[int, int]]':
+        '''channel name -> (kind, idxc)'''
+        index = {}
+        for kind in (CHANNEL, GPS_CHANNEL, GPS_RAW_CHANNEL):
+            for name, i in self._enum(kind):
+                assert(name not in index), "channel name collision!"
+                index[name] = (kind, i)
+        return index
+
+    def _enum(self, kind: int) -> 'list[tuple[str, int]]':
+        '''(name, idxc) of each channel of the given kind'''
+        count_fn, name_fn = _CHANNEL_NAME_FNS[kind]
+        idxf = self.xrk.idxf
+        return [(name_fn(idxf, i).decode('UTF-8'), i) for i in range(count_fn(idxf))]
+
+    def __getitem__(self, name: str) -> XRKChannel:
+        try:
+            return self._channels[name]
+        except KeyError:
+            pass
+        kind, idxc = self._index[name]
+        channel = XRKChannel(name, self.xrk.idxf, idxc, self.xrk, kind)
+        self._channels[name] = channel
+        return channel
+
+    def __contains__(self, name) -> bool:
+        # don't go via __getitem__, that would build the channel
+        return name in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
 
-# Function pointer swizzles of generic XRKChannel
-class XRKGPSrawChannel(XRKChannel):
-    def __init__(self, name: str, idxf: int, idxc: int, xrk):
-        super().__init__(name, idxf, idxc, xrk)
-        self.f_get_channel_units = XRKDLL.get_GPS_raw_channel_units
-        self.f_get_channel_samples_count = XRKDLL.get_GPS_raw_channel_samples_count
-        self.f_get_channel_samples = XRKDLL.get_GPS_raw_channel_samples
-        self.f_get_lap_channel_samples_count = XRKDLL.get_lap_GPS_raw_channel_samples_count
-        self.f_get_lap_channel_samples = XRKDLL.get_lap_GPS_raw_channel_samples
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self._index)})"
+
+    def clear_cache(self):
+        '''Drop the channels built so far, and anything they cached'''
+        for channel in self._channels.values():
+            channel._counts.clear()
+        self._channels.clear()
 
 
 class XRK():
     def __init__(self, filename: str):
         self.filename = filename
-        fileptr = c_char_p(os.path.abspath(f'{filename}').encode())
-        self.idxf = XRKDLL.open_file(fileptr.value)
+        self.idxf = XRKDLL.open_file(os.fsencode(os.path.abspath(filename)))
         # everything hinges off of idxf...
         assert(self.idxf > 0)
+        # (kind, idxc, lap) -> (times, values) of the most recently fetched
+        # samples, least recently used first; see XRKChannel._samples_raw
+        self._samples_cache = OrderedDict()
 
     def close(self):
+        # drop anything the channels cached from the now closed file
+        if 'channels' in self.__dict__:
+            self.channels.clear_cache()
+        self._samples_cache.clear()
         return XRKDLL.close_file_i(self.idxf) > 0
 
     def __repr__(self):
@@ -180,29 +388,27 @@ class XRK():
 
 
     def summary(self) -> str:
-        text = [textwrap.dedent(f'''\
+        header = textwrap.dedent(f'''\
             Track: {self.track_name}
             Date: {self.datetime}
             Driver: {self.racer_name}
             Vehicle: {self.vehicle_name}
             Championship: {self.championship_name}
             Laps: {self.lapcount}
-            '''),]
-        for i in range(len(self.lap_info)):
-            m, s = divmod(self.lap_info[i][1], 60)
-            if i == self.bestlap:
-                text.append(f'*{i}*\t*{m:.0f}:{s:.3f}*\n')
-            else:
-                text.append(f' {i} \t {m:.0f}:{s:.3f}\n')
-        return ''.join(text)
+            ''')
+        bestlap = self.bestlap
+        durations = self._laps[1]
+        mins, secs = np.divmod(durations, 60)
+        return header + ''.join(
+            f'*{i}*\t*{m:.0f}:{s:.3f}*\n' if i == bestlap else f' {i} \t {m:.0f}:{s:.3f}\n'
+            for i, (m, s) in enumerate(zip(mins.tolist(), secs.tolist())))
 
     @functools.cached_property
     def bestlap(self) -> int:
-        bestlap = 0
-        for i in range(len(self.lap_info)):
-            if self.lap_info[i][1] < self.lap_info[bestlap][1]:
-                bestlap=i
-        return bestlap
+        durations = self._laps[1]
+        if not len(durations):
+            return 0
+        return int(np.argmin(durations))
 
     @functools.cached_property
     def vehicle_name(self) -> str:
@@ -228,41 +434,24 @@ class XRK():
     def datetime(self) -> str:
         # returns a pointer, so we grab the 1st (only) one
         t = XRKDLL.get_date_and_time(self.idxf)[0]
-        mktime = time.mktime((t.tm_year+1900, t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min,
-                           t.tm_sec, t.tm_wday, t.tm_yday, t.tm_isdst))
-        return datetime.datetime.fromtimestamp(mktime).strftime("%Y-%m-%d %H:%M:%S")
+        return datetime.datetime(t.tm_year+1900, t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min,
+                                 t.tm_sec).strftime("%Y-%m-%d %H:%M:%S")
 
     @functools.cached_property
     def lapcount(self) -> int:
         return XRKDLL.get_laps_count(self.idxf)
 
     @functools.cached_property
-    def channels(self) -> dict:
-        channels = {}
-        for i in range(XRKDLL.get_channels_count(self.idxf)):
-            name = XRKDLL.get_channel_name(self.idxf, i).decode('UTF-8')
-            assert(name not in channels), "channel name collision!"
-            channels[name] = XRKChannel(name, self.idxf, i, self)
-
-        for i in range(XRKDLL.get_GPS_channels_count(self.idxf)):
-            name = XRKDLL.get_GPS_channel_name(self.idxf, i).decode('UTF-8')
-            assert(name not in channels), "channel name collision!"
-            channels[name] = XRKGPSChannel(name, self.idxf, i, self)
-
-        for i in range(XRKDLL.get_GPS_raw_channels_count(self.idxf)):
-            name = XRKDLL.get_GPS_raw_channel_name(self.idxf, i).decode('UTF-8')
-            assert(name not in channels), "channel name collision!"
-            channels[name] = XRKGPSrawChannel(name, self.idxf, i, self)
-
-        return channels
+    def channels(self) -> 'Mapping[str, XRKChannel]':
+        return _ChannelMap(self)
 
     @functools.cached_property
-    def timedistance(self) -> 'tuple[list[int], list[int]]':
+    def timedistance(self) -> 'tuple[np.ndarray, np.ndarray]':
         '''Compute the time distance vector for the entire datafile using GPS
         Speed
 
         Returns:
-            2 lists: absolute time, corresponding absolute distance
+            2 float64 arrays: absolute time, corresponding absolute distance
             [[time, ], [distance, ]]
         '''
         # XXX MUST set xabsolute and xtime or we recurse using the data we're calculating XXX
@@ -270,57 +459,45 @@ class XRK():
         assert(len(seconds) == len(speeds)) # paranoia
 
         # distance is in m/s
-        distance = [0, ]
-        totdistance = 0
-        for i in range(1, len(seconds)):
-            timedelta = seconds[i]-seconds[i-1]
-            traveled = timedelta*speeds[i]
-            totdistance = totdistance + traveled
-            distance.insert(i, totdistance)
-
-        return (seconds, distance)
+        return (seconds, _cumdistance(seconds, speeds))
 
 
-    def _tdlookup(self, needle, haystack, cdata):
-        '''Generic lookup for the timedistance pair of lists.
+    def timetodistance_array(self, itimes: np.ndarray) -> np.ndarray:
+        '''Convert an array of absolute times (s) to absolute distances (m)'''
+        times, distances = self.timedistance
+        itimes = np.asarray(itimes, dtype=np.float64)
+        return np.round(_interp_lookup(itimes, times, distances), 4)
 
-        This will find a point in one stream, and return the corresponding data
-        point in the other, including interpolating when necessary.
-        '''
-        idx = bisect.bisect_left(haystack, needle)
-        if idx >= len(haystack):
-            return cdata[-1]
-        elif haystack[idx] == needle:
-            # easy, found the needle, just return the data
-            return cdata[idx]
-        else:
-            # non-easy case, interpolate
-            try:
-                ratio = ((needle - haystack[idx]) / 
-                         (haystack[idx+1] - haystack[idx]))
-            except ZeroDivisionError:
-                ratio = 1
-            fudge = (cdata[idx+1] - cdata[idx]) * ratio
-            return round(cdata[idx]+fudge, 4)
+    def distancetotime_array(self, idistances: np.ndarray) -> np.ndarray:
+        '''Convert an array of absolute distances (m) to absolute times (s)'''
+        times, distances = self.timedistance
+        idistances = np.asarray(idistances, dtype=np.float64)
+        return np.round(_interp_lookup(idistances, distances, times), 4)
 
     def timetodistance(self, itime: float):
         '''Convert an absolute time (s) to absolute distance (m)'''
-        times, distances = self.timedistance
-        return self._tdlookup(itime, times, distances)
+        return float(self.timetodistance_array(np.array([itime]))[0])
 
     def distancetotime(self, idistance: float):
         '''Convert an absolute distance (m) to absolute time (s)'''
-        times, distances = self.timedistance
-        return self._tdlookup(idistance, distances, times)
+        return float(self.distancetotime_array(np.array([idistance]))[0])
 
     @functools.cached_property
-    def lap_info(self) -> 'list[tuple[float, float]]':
+    def _laps(self) -> 'tuple[np.ndarray, np.ndarray]':
+        '''Lap starts and durations (s) as a pair of float64 arrays'''
         pstart = c_double(0)
         pduration = c_double(0)
 
-        data = []
+        starts = np.empty(self.lapcount, dtype=np.float64)
+        durations = np.empty(self.lapcount, dtype=np.float64)
         for i in range(self.lapcount):
             XRKDLL.get_lap_info(self.idxf, i, byref(pstart), byref(pduration))
-            data.append((round(pstart.value, 4), round(pduration.value, 4)))
+            starts[i] = pstart.value
+            durations[i] = pduration.value
 
-        return data
+        return (np.round(starts, 4), np.round(durations, 4))
+
+    @functools.cached_property
+    def lap_info(self) -> 'list[tuple[float, float]]':
+        starts, durations = self._laps
+        return list(zip(starts.tolist(), durations.tolist()))